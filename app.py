@@ -3,6 +3,7 @@ from dash_html_components import Output
 
 from imports import *
 from processII import ControlSystem
+from store import ScenarioStore
 from dash.dependencies import Input, Output, State, MATCH, ALL
 import plotly.express as px
 
@@ -31,6 +32,34 @@ config = {
     "save_tolerance": 0.000001  # tolerancja zapisu                     # od 0.0001 do 0.1
 }
 
+# Układy wykresów, wspólne dla wszystkich konfiguracji
+figure_layouts = {
+    "power": {"title": {"text": "Moc wytwarzana przez turbinę w funkcji czasu"},
+              "xaxis": {"title": {"text": "czas [s]"}}, "yaxis": {"title": {"text": "moc [W]"}},
+              "legend": {"title": {"text": "legenda"}}},
+    "flow": {"title": {"text": "Przeplyw cieczy i pole przekroju wplywu do turbiny w zależności od czasu"},
+             "xaxis": {"title": {"text": "czas [s]"}}, "yaxis": {"title": {"text": "PW [l/s], PP [cm^2]"}},
+             "legend": {"title": {"text": "legenda"}}},
+    "steer": {"title": {"text": "Przebieg zmian napęcia sterującego w funkcji czasu"},
+              "xaxis": {"title": {"text": "czas [s]"}}, "yaxis": {"title": {"text": "napiecie sterujące [V]"}},
+              "legend": {"title": {"text": "legenda"}}},
+    "flow_steer": {"title": {"text": "Przepływ cieczy w funkcji napięcia sterujacego"},
+                   "xaxis": {"title": {"text": "napiecie sterujące [V]"}},
+                   "yaxis": {"title": {"text": "przepływ cieczy [l/s]"}},
+                   "legend": {"title": {"text": "legenda"}}},
+}
+trace_cache_limit = 32  # liczba zapamiętanych konfiguracji
+webgl_threshold = 2000  # liczba punktów, od której seria rysowana jest przez WebGL
+trace_points = 4000  # maksymalna liczba punktów serii wysyłanej do przeglądarki (około 2x szerokość wykresu)
+live_interval = 250  # okres odpytywania wykresu na żywo [ms]
+live_chunk_steps = 20  # kroki symulacji na jeden odczyt przy terminowym odpytywaniu
+live_chunk_points = 50  # maksymalna liczba punktów serii w jednym odczycie
+live_session_timeout = 60  # czas bez odpytania, po którym strumień klienta jest usuwany [s]
+scenario_store_path = "scenarios"  # katalog magazynu wyników scenariuszy
+scenario_page_size = 20  # liczba wierszy na stronie tabeli scenariuszy
+scenario_plot_limit = 10  # maksymalna liczba scenariuszy rysowanych jednocześnie
+scenario_columns = ["id", "settling_time", "overshoot", "P_final", "P_dest", "kp", "beta", "L", "K", "A", "eta_T"]
+
 
 class App(object):
     def __init__(self):
@@ -51,6 +80,11 @@ class App(object):
 
         self.dataframes: Dict[str, pd.DataFrame] = dict()
         self.figures: Dict[str, plt.Figure] = dict()
+        self.trace_cache: Dict[Tuple, Tuple[pd.DataFrame, Dict[str, List[Dict]]]] = dict()
+        self.live_sessions: Dict[str, Dict] = dict()
+        self.live_lock = threading.Lock()
+        self.trace_lock = threading.Lock()
+        self.store = ScenarioStore(scenario_store_path)
         self.tabs: List[dcc.Tab] = []
         self.display_tabs: List = []
 
@@ -74,7 +108,23 @@ class App(object):
         # Update Config Displays
         self.app.callback([Output('display-config-group', 'children'),
                            Output('charts-output', 'children')],
-                          Input('update-charts-button', 'n_clicks'))(self.__controller_charts_datafigures)
+                          Input('update-charts-button', 'n_clicks'),
+                          State('scenario-table', 'selected_row_ids'))(self.__controller_charts_datafigures)
+
+        # Scenario table paging and sorting
+        self.app.callback([Output('scenario-table', 'data'),
+                           Output('scenario-table', 'page_count')],
+                          [Input('scenario-table', 'page_current'),
+                           Input('scenario-table', 'page_size'),
+                           Input('scenario-table', 'sort_by')])(self.__controller_scenario_table)
+
+        # Live chart streaming
+        self.app.callback([Output('live-chart', 'figure'),
+                           Output('live-chart', 'extendData'),
+                           Output('live-interval', 'disabled')],
+                          [Input('live-charts-button', 'n_clicks'),
+                           Input('live-interval', 'n_intervals')],
+                          State('session-id', 'data'))(self.__controller_live_chart)
 
         # Update Sidebar buttons mess MESS
         self.app.callback([Output('display-data', 'children'),
@@ -130,6 +180,7 @@ class App(object):
             dbc.Card(
                 [dbc.ButtonGroup([
                     dbc.Button('Zaktualizuj', 'update-charts-button', color='primary'),
+                    dbc.Button('Na żywo', 'live-charts-button', color='primary'),
                     dbc.Button('Zapisz', 'update-config-button', color='primary'), ]),
                     dbc.Button("Domyślne", "default-parameters-button")]
             )], id="charts_input")
@@ -142,21 +193,42 @@ class App(object):
 
         # Display
         charts = html.Div(children=[], id="charts-output")
+        live_chart = html.Div(children=[
+            dcc.Graph(id="live-chart", figure={"data": [], "layout": figure_layouts["power"]}),
+            dcc.Interval(id="live-interval", interval=live_interval, disabled=True),
+        ], id="live-output")
 
         results = dbc.Row(id="display-data")
+        scenarios = dash_table.DataTable(
+            id="scenario-table",
+            columns=[{'name': column, 'id': column} for column in scenario_columns],
+            page_current=0,
+            page_size=scenario_page_size,
+            page_action='custom',
+            sort_action='custom',
+            sort_mode='multi',
+            sort_by=[],
+            row_selectable='multi',
+            selected_rows=[])
         display = html.Div(children=[
             html.H2('Wykresy', style=TEXT_STYLE),
             html.Hr(),
             charts,
+            live_chart,
+
+            html.Div([html.H2('Scenariusze', style=TEXT_STYLE),
+                      html.Hr(),
+                      scenarios]),
 
             html.Div([html.H2('Dane', style=TEXT_STYLE),
                       html.Hr(),
                       results]),
         ], id="display", style=CONTENT_STYLE)
 
-        # Finalize
-        self.app.layout = html.Div(children=[
+        # Finalize, layout budowany przy każdym wejściu na stronę, żeby klient dostał własne "session-id"
+        self.app.layout = lambda: html.Div(children=[
             html.P(children=None, id='dummy-handler'),
+            dcc.Store(id='session-id', data=str(uuid.uuid4())),
             sidebar,
             display,
         ], id="page")
@@ -341,75 +413,131 @@ class App(object):
                 id="display-config-group")]
         return self.display_tabs, self.tabs, None
 
-    def __controller_charts_datafigures(self, btn1):
+    def __controller_charts_datafigures(self, btn1, scenario_ids):
         configs = sorted(self.chart_configs.keys())
+        traces: Dict[str, Dict[str, List[Dict]]] = dict()
         for (i, config) in zip(map(lambda x: int(x.split('-')[1]) - 1, configs), configs):
-            self.dataframes[config] = ControlSystem(**self.chart_configs[config]).dataframe
+            self.dataframes[config], traces[config.replace('config-', 'Konfiguracja ')] = \
+                self.__config_traces(self.chart_configs[config])
             self.config_cards[i].children[1].children = self.__config_string(self.chart_configs[config])
 
-        if not self.dataframes: return [self.config_cards, None]
+        # Scenariusze z magazynu wczytywane dopiero po zaznaczeniu w tabeli,
+        # wersja pliku w kluczu unieważnia pamięć podręczną po ponownym zapisie scenariusza
+        for scenario_id in (scenario_ids or [])[:scenario_plot_limit]:
+            version = self.store.version(scenario_id)
+            if version is None: continue
+            try:
+                _, traces[f"Scenariusz {scenario_id}"] = self.__cached_traces(
+                    ("scenario", scenario_id, version), lambda: self.store.load(scenario_id))
+            except (KeyError, OSError):
+                continue
 
-        figures = []
+        if not traces: return [self.config_cards, None]
 
-        # Tutaj tworzycie wyresy jakie chcecie według tych schematow na dole ⬇
-        # {"t": [0], "H_loss": [0], "e": [self.P_init], "u": [0], "delta_H": [0], "H": [0], "S": [0], "Q": [0]}
-        # Poziom Wody
-        fig = go.Figure()
-        fig.update_layout(
-            title="Moc wytwarzana przez turbinę w funkcji czasu",
-            xaxis_title="czas [s]",
-            yaxis_title="moc [W]",
-            legend_title="legenda",
-        )
-        df: pd.DataFrame
-        for (name, df) in self.dataframes.items():
-            name = name.replace("config-", "Konfiguracja ")
-            fig.add_trace(go.Scatter(x=df['t'], y=df['P'], mode='lines+markers', name=f"{name} - Osiągnięta moc", ))
-        figures.append(dcc.Graph(figure=fig))
-
-        # Poziom Wpływ wypływ
-        fig = go.Figure()
-        fig.update_layout(
-            title="Przeplyw cieczy i pole przekroju wplywu do turbiny w zależności od czasu",
-            xaxis_title="czas [s]",
-            yaxis_title="PW [l/s], PP [cm^2]",
-            legend_title="legenda",
-        )
-        for (name, df) in self.dataframes.items():
-            name = name.replace("config-", "Konfiguracja ")
-            fig.add_trace(
-                go.Scatter(x=df['t'], y=df['Q'] * 1000, mode='lines+markers', name=f"{name} - Przepływ cieczy (PW)"))
-            fig.add_trace(go.Scatter(x=df['t'], y=df['S'] * 10000, mode='lines+markers',
-                                     name=f"{name} - Pole przekroju wpływu (PP)"))
-        figures.append(dcc.Graph(figure=fig))
-
-        # Poziom Napięcie sterujące
-        fig = go.Figure()
-        fig.update_layout(
-            title="Przebieg zmian napęcia sterującego w funkcji czasu",
-            xaxis_title="czas [s]",
-            yaxis_title="napiecie sterujące [V]",
-            legend_title="legenda",
-        )
-        for (name, df) in self.dataframes.items():
-            name = name.replace("config-", "Konfiguracja ")
-            fig.add_trace(go.Scatter(x=df['t'], y=df['u'], mode='lines+markers', name=f"{name} - Osiągnięta wielkość sterująca"))
-        figures.append(dcc.Graph(figure=fig))
-
-        # Poziom Wody
-        fig = go.Figure()
-        fig.update_layout(
-            title="Przepływ cieczy w funkcji napięcia sterujacego",
-            xaxis_title="napiecie sterujące [V]",
-            yaxis_title="przepływ cieczy [l/s]",
-            legend_title="legenda",
-        )
-        for (name, df) in self.dataframes.items():
-            name = name.replace("config-", "Konfiguracja ")
-            fig.add_trace(go.Scatter(x=df['u'], y=df['Q'] * 1000, mode='lines+markers', name=f"{name} - Osiągnięty przepływ cieczy"))
-        figures.append(dcc.Graph(figure=fig))
+        # Wykresy budowane z gotowych słowników, bez walidacji obiektów go.Figure
+        figures = []
+        for (chart, layout) in figure_layouts.items():
+            data = [dict(trace, name=f"{name} - {trace['name']}")
+                    for (name, name_traces) in traces.items() for trace in name_traces[chart]]
+            figures.append(dcc.Graph(figure={"data": data, "layout": layout}))
         return [self.config_cards, figures]
 
+    def __controller_scenario_table(self, page_current, page_size, sort_by):
+        return self.store.page(page_current or 0, page_size or scenario_page_size, sort_by)
+
+    def __config_traces(self, config: Dict[str, Union[int, float]]) -> (pd.DataFrame, Dict[str, List[Dict]]):
+        """Zwraca wyniki symulacji i serie wykresów dla konfiguracji,
+        przeliczając je tylko przy pierwszym użyciu danej konfiguracji"""
+        return self.__cached_traces(tuple(sorted(config.items())), lambda: ControlSystem(**config).dataframe)
+
+    def __cached_traces(self, key: Tuple, load: Callable[[], pd.DataFrame]) -> (pd.DataFrame, Dict[str, List[Dict]]):
+        """Serie wykresów z pamięci podręcznej, współdzielonej przez wątki serwera (dostęp pod "trace_lock").
+        Symulacja liczona jest poza blokadą, więc równoczesne zapytania o tę samą konfigurację
+        mogą ją przeliczyć dwukrotnie, ale nie blokują się nawzajem"""
+        with self.trace_lock:
+            cached = self.trace_cache.get(key)
+        if cached is not None: return cached
+
+        df = load()
+        # Do przeglądarki trafia co n-ta próbka (z ostatnią), najwyżej "trace_points" punktów na serię
+        stride = max(1, -(-len(df) // trace_points))
+        plotted = df.iloc[(len(df) - 1) % stride::stride]
+        t, P, u = plotted['t'].to_numpy(), plotted['P'].to_numpy(), plotted['u'].to_numpy()
+        Q, S = plotted['Q'].to_numpy() * 1000, plotted['S'].to_numpy() * 10000
+
+        # Duże serie rysowane przez WebGL
+        kind = "scattergl" if len(plotted) > webgl_threshold else "scatter"
+
+        def trace(x: np.ndarray, y: np.ndarray, name: str) -> Dict:
+            return {"type": kind, "x": x, "y": y, "mode": "lines+markers", "name": name}
+
+        entry = (df, {
+            "power": [trace(t, P, "Osiągnięta moc")],
+            "flow": [trace(t, Q, "Przepływ cieczy (PW)"), trace(t, S, "Pole przekroju wpływu (PP)")],
+            "steer": [trace(t, u, "Osiągnięta wielkość sterująca")],
+            "flow_steer": [trace(u, Q, "Osiągnięty przepływ cieczy")],
+        })
+        with self.trace_lock:
+            if key not in self.trace_cache and len(self.trace_cache) >= trace_cache_limit:
+                self.trace_cache.pop(next(iter(self.trace_cache)))
+            self.trace_cache[key] = entry
+        return entry
+
+    def __controller_live_chart(self, btn1, n_intervals, session_id):
+        """Wykres mocy na żywo - symulacje liczone są porcjami przy każdym odpytaniu
+        przez "live-interval", a do przeglądarki trafiają tylko nowe punkty (extendData).
+        Strumienie i czas ostatniego odpytania są osobne dla każdego klienta ("session-id").
+        Jeśli klient odpytuje rzadziej niż co "live_interval", porcje obejmują więcej kroków,
+        ale są przerzedzane do "live_chunk_points" punktów na serię
+        """
+        context = dash.callback_context
+        if context.triggered and context.triggered[0]['prop_id'].startswith('live-charts-button'):
+            return self.__start_live_chart(session_id)
+        with self.live_lock:
+            session = self.live_sessions.get(session_id)
+        if session is None: return dash.no_update, dash.no_update, True
+
+        extension, indices = {"x": [], "y": []}, []
+        with session["lock"]:
+            now = time.perf_counter()
+            lag = max(1.0, (now - session["last_poll"]) * 1000 / live_interval)
+            session["last_poll"] = now
+            steps = int(live_chunk_steps * lag)
+            stride = -(-steps // live_chunk_points)
+
+            for (i, stream) in enumerate(session["streams"].values()):
+                chunk = stream.advance(steps)
+                if not chunk['t']: continue
+                offset = (len(chunk['t']) - 1) % stride
+                extension["x"].append(chunk['t'][offset::stride])
+                extension["y"].append(chunk['P'][offset::stride])
+                indices.append(i)
+
+            finished = all(stream.finished for stream in session["streams"].values())
+        if finished:
+            with self.live_lock:
+                if self.live_sessions.get(session_id) is session: del self.live_sessions[session_id]
+        return dash.no_update, [extension, indices] if indices else dash.no_update, finished
+
+    def __start_live_chart(self, session_id: str):
+        streams = {config: ControlSystem(**self.chart_configs[config], run=False)
+                   for config in sorted(self.chart_configs.keys())}
+        now = time.perf_counter()
+        with self.live_lock:
+            # Porzucone strumienie (zamknięte karty) usuwane przy starcie kolejnego
+            for (expired, session) in list(self.live_sessions.items()):
+                if now - session["last_poll"] > live_session_timeout: del self.live_sessions[expired]
+            if streams:
+                self.live_sessions[session_id] = {"streams": streams, "last_poll": now, "lock": threading.Lock()}
+            else:
+                self.live_sessions.pop(session_id, None)
+
+        figure = {"data": [{"type": "scatter", "x": [], "y": [], "mode": "lines",
+                            "name": f"{config.replace('config-', 'Konfiguracja ')} - Osiągnięta moc"}
+                           for config in streams],
+                  "layout": figure_layouts["power"]}
+        return figure, dash.no_update, not streams
+
     def __controller_sidebar_buttons(self, chart_count, btn1, btn2, selected_chart):
         # 'tabs-config-picker', 'value'
         def set_default_config():
@@ -0,0 +1,123 @@
+import argparse
+import hashlib
+import json
+import sys
+
+from imports import *
+from signals import step
+import process
+import processII
+
+# Stały zestaw konfiguracji do porównywania wersji silnika
+tank_config = {
+    "kp": 0.02, "A": 1.5, "beta": 0.035, "h_init": 0, "h_dest": 1.5,
+    "t": 600, "Tp": 0.1, "Ti": 0.5, "Td": 0.05,
+    "h_min": 0, "h_max": 5, "u_min": 0, "u_max": 10, "Qd_min": 0, "Qd_max": 0.05,
+    "iteration_limit": 10000, "save_tolerance": 0.001,
+}
+turbine_config = {
+    "t": 10, "Tp": 0.05, "Ti": 0.25, "Td": 0.15,
+    "g": 9.81, "L": 10, "A": 0.1, "K": 2000, "eta_T": 0.8, "ro": 789,
+    "u_min": 0, "u_max": 185, "P_init": 0, "P_dest": 1_000,
+    "kp": 0.00015, "beta": 0.00025, "save_tolerance": 0.000001,
+}
+corpus: Dict[str, Callable[[], pd.DataFrame]] = {
+    "process/default": lambda: process.ControlSystem(**tank_config).dataframe,
+    "process/setpoint-step": lambda: process.ControlSystem(**{
+        **tank_config, "h_dest": step(tank_config["t"], tank_config["Tp"], 1.0, 2.0, 300)}).dataframe,
+    "processII/default": lambda: processII.ControlSystem(**turbine_config).dataframe,
+    "processII/kp-high": lambda: processII.ControlSystem(**{**turbine_config, "kp": 0.0002}).dataframe,
+    "processII/beta-low": lambda: processII.ControlSystem(**{**turbine_config, "beta": 0.00005}).dataframe,
+    "processII/long-pipe": lambda: processII.ControlSystem(**{**turbine_config, "L": 20, "K": 500}).dataframe,
+    "processII/setpoint-step": lambda: processII.ControlSystem(**{
+        **turbine_config, "P_dest": step(turbine_config["t"], turbine_config["Tp"], 1_000, 2_000, 5)}).dataframe,
+    "processII/disturbance": lambda: processII.ControlSystem(**{
+        **turbine_config, "disturbance": step(turbine_config["t"], turbine_config["Tp"], 0, -200, 5)}).dataframe,
+}
+windows = 10  # liczba okien czasowych w odcisku kolumny
+quantum = 1e-6  # krok kwantyzacji wartości przed haszowaniem
+
+
+def column_fingerprint(t: np.ndarray, values: np.ndarray) -> Dict:
+    """Odcisk kolumny wyników: hasz wartości po kwantyzacji,
+    statystyki całego przebiegu oraz statystyki w oknach czasowych
+    """
+    quantized = np.round(values / quantum).astype(np.int64)
+    bounds = np.linspace(t.min(), t.max(), windows + 1) if len(t) else np.zeros(windows + 1)
+    window_ids = np.clip(np.searchsorted(bounds, t, side='right') - 1, 0, windows - 1)
+    return {
+        "hash": hashlib.sha256(quantized.tobytes()).hexdigest()[:16],
+        "stats": summary(values),
+        "windows": [{"t": [float(bounds[i]), float(bounds[i + 1])], **summary(values[window_ids == i])}
+                    for i in range(windows)],
+    }
+
+
+def summary(values: np.ndarray) -> Dict[str, float]:
+    if not len(values): return {"count": 0}
+    return {"count": int(len(values)), "min": float(values.min()), "max": float(values.max()),
+            "mean": float(values.mean()), "std": float(values.std()), "last": float(values[-1])}
+
+
+def record() -> Dict[str, Dict]:
+    result = dict()
+    for (name, run) in corpus.items():
+        df = run()
+        t = df['t'].to_numpy(dtype=float)
+        result[name] = {column: column_fingerprint(t, df[column].to_numpy(dtype=float)) for column in df.columns}
+    return result
+
+
+def diff(old: Dict[str, Dict], new: Dict[str, Dict], rtol: float, atol: float) -> List[str]:
+    """Lista rozbieżności między dwoma zestawami odcisków, pusta gdy wyniki są zgodne"""
+    mismatches = []
+    for name in sorted(old.keys() | new.keys()):
+        if name not in old or name not in new:
+            mismatches.append(f"{name}: brak przebiegu w {'starym' if name not in old else 'nowym'} zestawie")
+            continue
+        for column in sorted(old[name].keys() | new[name].keys()):
+            a, b = old[name].get(column), new[name].get(column)
+            if a is None or b is None:
+                mismatches.append(f"{name} [{column}]: brak kolumny w {'starym' if a is None else 'nowym'} zestawie")
+                continue
+            if a["hash"] == b["hash"]: continue
+            mismatches.extend(f"{name} [{column}] {where}: {field} {x} != {y}"
+                              for (where, field, x, y) in compare(a, b, rtol, atol))
+    return mismatches
+
+
+def compare(a: Dict, b: Dict, rtol: float, atol: float) -> Iterator[Tuple[str, str, float, float]]:
+    for (where, x, y) in [("całość", a["stats"], b["stats"]),
+                          *((f"t={wa['t'][0]:g}..{wa['t'][1]:g}", wa, wb) for (wa, wb) in zip(a["windows"], b["windows"]))]:
+        for field in sorted(x.keys() | y.keys()):
+            if field == "t": continue
+            if field not in x or field not in y or not np.isclose(x[field], y[field], rtol=rtol, atol=atol):
+                yield where, field, x.get(field), y.get(field)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Odciski wyników symulacji i porównanie wersji silnika")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record_parser = commands.add_parser("record", help="Przelicza zestaw konfiguracji i zapisuje odciski")
+    record_parser.add_argument("output")
+    diff_parser = commands.add_parser("diff", help="Porównuje dwa zapisane zestawy odcisków")
+    diff_parser.add_argument("old")
+    diff_parser.add_argument("new")
+    diff_parser.add_argument("--rtol", type=float, default=1e-6)
+    diff_parser.add_argument("--atol", type=float, default=1e-9)
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(record(), file, indent=1, sort_keys=True)
+        return 0
+
+    with open(args.old, encoding="utf-8") as old, open(args.new, encoding="utf-8") as new:
+        mismatches = diff(json.load(old), json.load(new), args.rtol, args.atol)
+    for mismatch in mismatches: print(mismatch)
+    print(f"Rozbieżności: {len(mismatches)}")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,155 @@
+from imports import *
+
+flush_rows = 4096  # liczba wierszy buforowanych w liście przed przepisaniem do tablicy numpy
+
+
+class TypedHistory(object):
+    def __init__(self, columns: Sequence[str], capacity: int, dtype: str):
+        """Historia symulacji przechowywana w tablicy numpy o stałym typie (wiersz = krok)
+        Zamiast list obiektów float (24+ bajtów na próbkę) trzyma surowe wartości,
+        tablica jest alokowana z góry i rośnie dwukrotnie gdy zabraknie miejsca.
+        Kroki dopisywane są całymi wierszami do krótkiego bufora, który co "flush_rows"
+        wierszy przepisywany jest do tablicy jedną operacją, więc pętla symulacji
+        nie wykonuje operacji numpy w każdym kroku
+
+        :param columns: Nazwy kolumn (kolejność wartości w wierszu)
+        :param capacity: Przewidywana liczba wierszy
+        :param dtype: Typ danych tablicy (np. "float64", "float32")
+        """
+        self.columns: List[str] = list(columns)
+        self.__values: np.ndarray = np.empty((max(capacity, 1), len(self.columns)), dtype=dtype)
+        self.__size: int = 0
+        self.__rows: List[Tuple[float, ...]] = []
+
+    def append(self, row: Tuple[float, ...]):
+        self.__rows.append(row)
+        if len(self.__rows) == flush_rows: self.__flush()
+
+    def __flush(self):
+        if not self.__rows: return
+        end = self.__size + len(self.__rows)
+        if end > len(self.__values):
+            grown = np.empty((max(end, 2 * len(self.__values)), len(self.columns)), dtype=self.__values.dtype)
+            grown[:self.__size] = self.__values[:self.__size]
+            self.__values = grown
+        self.__values[self.__size:end] = self.__rows
+        self.__size = end
+        self.__rows.clear()
+
+    def __len__(self) -> int:
+        return self.__size + len(self.__rows)
+
+    def to_dict(self) -> Dict[str, np.ndarray]:
+        self.__flush()
+        return {name: self.__values[:self.__size, i] for (i, name) in enumerate(self.columns)}
+
+    @property
+    def nbytes(self) -> int:
+        return self.__values.nbytes
+
+
+class RingHistory(object):
+    def __init__(self, columns: Sequence[str], capacity: int, dtype: str, decimation: int):
+        """Historia symulacji o stałym rozmiarze pamięci
+        Przetrzymuje ostatnie "capacity" wierszy w buforze cyklicznym oraz
+        przerzedzoną historię (co "decimation" wiersz) starszych odczytów.
+        Gdy historia się zapełni, zostaje przerzedzona dwukrotnie,
+        więc pamięć nie rośnie wraz z długością symulacji
+
+        :param columns: Nazwy kolumn (kolejność wartości w wierszu)
+        :param capacity: Liczba ostatnich wierszy przechowywanych w całości
+        :param dtype: Typ danych tablic (np. "float64", "float32")
+        :param decimation: Początkowy krok przerzedzania historii
+        """
+        self.columns: List[str] = list(columns)
+        self.__ring: np.ndarray = np.empty((capacity, len(self.columns)), dtype=dtype)
+        self.__history: np.ndarray = np.empty((capacity, len(self.columns)), dtype=dtype)
+        self.__history_size: int = 0
+        self.__stride: int = decimation
+        self.__count: int = 0
+        self.__rows: List[Tuple[float, ...]] = []
+        self.__flush_rows: int = min(flush_rows, capacity)
+
+    def append(self, row: Tuple[float, ...]):
+        self.__rows.append(row)
+        if len(self.__rows) == self.__flush_rows: self.__flush()
+
+    def __flush(self):
+        if not self.__rows: return
+        block = np.array(self.__rows, dtype=self.__ring.dtype)
+        self.__rows.clear()
+
+        self.__decimate(block, np.arange(self.__count, self.__count + len(block)))
+        self.__ring[(self.__count + np.arange(len(block))) % len(self.__ring)] = block
+        self.__count += len(block)
+
+    def __decimate(self, block: np.ndarray, indices: np.ndarray):
+        while True:
+            kept = indices % self.__stride == 0
+            block, indices = block[kept], indices[kept]
+            free = len(self.__history) - self.__history_size
+            written = min(free, len(block))
+            self.__history[self.__history_size:self.__history_size + written] = block[:written]
+            self.__history_size += written
+            if written == len(block): return
+            block, indices = block[written:], indices[written:]
+            self.__compact_history()
+
+    def __compact_history(self):
+        kept = self.__history[:self.__history_size:2].copy()
+        self.__history[:len(kept)] = kept
+        self.__history_size = len(kept)
+        self.__stride *= 2
+
+    def __len__(self) -> int:
+        return self.__count + len(self.__rows)
+
+    def to_dict(self) -> Dict[str, np.ndarray]:
+        self.__flush()
+        start = max(0, self.__count - len(self.__ring))
+        older = self.__history[:min(self.__history_size, -(-start // self.__stride))]
+        recent = np.roll(self.__ring, -(self.__count % len(self.__ring)), axis=0)[-min(self.__count, len(self.__ring)):]
+        values = np.concatenate([older, recent])
+        return {name: values[:, i] for (i, name) in enumerate(self.columns)}
+
+    @property
+    def nbytes(self) -> int:
+        return self.__ring.nbytes + self.__history.nbytes
+
+
+def make_history(columns: Sequence[str],
+                 capacity: int,
+                 dtype: str = "float64",
+                 history_limit: Optional[int] = None,
+                 decimation: int = 10) -> Union[TypedHistory, RingHistory]:
+    """Tworzy historię danych dla symulacji
+
+    :param columns: Nazwy kolumn
+    :param capacity: Przewidywana liczba wierszy
+    :param dtype: Typ danych kolumn (np. "float64", "float32")
+    :param history_limit: Liczba ostatnich wierszy trzymanych w całości, None - cała historia
+    :param decimation: Krok przerzedzania starszej historii w trybie z limitem
+    """
+    if history_limit is None:
+        return TypedHistory(columns, capacity, dtype)
+    if history_limit < 2:
+        raise ValueError("history_limit musi wynosić co najmniej 2 (przerzedzanie historii zostawia co drugi wiersz)")
+    if decimation < 1:
+        raise ValueError("decimation musi wynosić co najmniej 1")
+    return RingHistory(columns, history_limit, dtype, decimation)
+
+
+def memory_report(history: Union[TypedHistory, RingHistory], dataframe: pd.DataFrame) -> Dict[str, int]:
+    """Raport zużycia pamięci przez dane symulacji w bajtach
+
+    "columns" - pamięć zarezerwowana na historię w trakcie symulacji,
+    "boxed_estimate" - szacowane zużycie dla listy obiektów float (24 B na wartość + 8 B wskaźnika),
+    "dataframe" - pamięć wynikowej ramki danych
+    """
+    samples = len(history) * len(history.columns)
+    return {
+        "samples": samples,
+        "columns": history.nbytes,
+        "boxed_estimate": samples * 32,
+        "dataframe": int(dataframe.memory_usage(deep=True).sum()),
+    }
@@ -1,6 +1,7 @@
 import dash_core_components as dcc
 import dash_bootstrap_components as dbc
 import dash_html_components as html
+import dash_table
 from random import sample
 import plotly as plt
 from typing import *
@@ -8,4 +9,8 @@ import pandas as pd
 import numpy as np
 import dash
 import re
+import os
+import time
+import threading
+import uuid
 import plotly.graph_objects as go
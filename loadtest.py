@@ -0,0 +1,171 @@
+import argparse
+import json
+import logging
+import random
+import sys
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import make_server
+
+from imports import *
+from app import App
+
+# Suwaki zmieniane przez symulowanych użytkowników wraz z zakresami wartości
+sliders = {"kp": (0.00005, 0.0002), "beta": (0.00005, 0.0001), "L": (1, 20), "P_dest": (0, 5_000_000), "t": (1, 100)}
+
+
+def dynamic_parameter(index: str) -> Dict[str, str]:
+    return {"index": index, "type": "dynamic-parameter"}
+
+
+def prop_id(component: Union[str, Dict], prop: str) -> str:
+    """Identyfikator właściwości w formacie Dash ("id.prop", identyfikatory słownikowe jako JSON)"""
+    if isinstance(component, dict): component = json.dumps(component, sort_keys=True, separators=(',', ':'))
+    return f"{component}.{prop}"
+
+
+def payload(outputs: List[Tuple[str, str]], inputs: List, state: List, changed: str) -> Dict:
+    """Treść zapytania /_dash-update-component dla jednego wywołania callbacku"""
+    return {
+        "output": f"..{'...'.join(prop_id(*output) for output in outputs)}.." if len(outputs) > 1
+        else prop_id(*outputs[0]),
+        "outputs": [{"id": id_, "property": prop} for (id_, prop) in outputs] if len(outputs) > 1
+        else {"id": outputs[0][0], "property": outputs[0][1]},
+        "inputs": inputs,
+        "state": state,
+        "changedPropIds": [changed],
+    }
+
+
+def sidebar(chart_count: int, save_clicks: Optional[int], selected: Optional[str], changed: str) -> Dict:
+    return payload([("display-data", "children"), ("tabs-config-picker", "children"), ("tabs-config-picker", "value")],
+                   [{"id": "chart-config-count", "property": "value", "value": chart_count},
+                    {"id": "default-parameters-button", "property": "n_clicks", "value": None},
+                    {"id": "update-config-button", "property": "n_clicks", "value": save_clicks}],
+                   [{"id": "tabs-config-picker", "property": "value", "value": selected}],
+                   changed)
+
+
+def slider(index: str, value: float) -> Dict:
+    return payload([("display-config-current", "children")],
+                   [[{"id": dynamic_parameter(index), "property": "value", "value": value}]],
+                   [],
+                   prop_id(dynamic_parameter(index), "value"))
+
+
+def update_charts(clicks: int) -> Dict:
+    return payload([("display-config-group", "children"), ("charts-output", "children")],
+                   [{"id": "update-charts-button", "property": "n_clicks", "value": clicks}],
+                   [{"id": "scenario-table", "property": "selected_row_ids", "value": None}],
+                   "update-charts-button.n_clicks")
+
+
+def rss() -> Optional[int]:
+    """Aktualna pamięć rezydentna bieżącego procesu [B] (tylko Linux)"""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+class LoadTest(object):
+    def __init__(self, url: str, sessions: int, iterations: int, seed: int = 0):
+        """Symulacja równoczesnych użytkowników App wywołujących prawdziwe callbacki
+        Każda sesja wybiera jeden wykres, a w każdej iteracji przesuwa suwaki,
+        zapisuje konfigurację ("Zapisz") i przelicza wykresy ("Zaktualizuj"),
+        czasy odpowiedzi są w "latencies" (akcja -> lista czasów [s])
+
+        :param url: Adres serwera
+        :param sessions: Liczba równoczesnych sesji
+        :param iterations: Liczba iteracji na sesję
+        :param seed: Ziarno losowania wartości suwaków
+        """
+        self.url = url.rstrip('/')
+        self.sessions = sessions
+        self.iterations = iterations
+        self.seed = seed
+
+        self.latencies: Dict[str, List[float]] = dict()
+        self.errors: int = 0
+        self.elapsed: float = 0
+        self.__lock = threading.Lock()
+
+    def run(self) -> 'LoadTest':
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.sessions) as executor:
+            list(executor.map(self.__session, range(self.sessions)))
+        self.elapsed = time.perf_counter() - start
+        return self
+
+    def __session(self, session: int):
+        generator = random.Random(self.seed + session)
+        self.__request("chart_count", sidebar(1, None, None, "chart-config-count.value"))
+        for iteration in range(1, self.iterations + 1):
+            for index in generator.sample(list(sliders), 3):
+                self.__request("slider", slider(index, generator.uniform(*sliders[index])))
+            self.__request("save", sidebar(1, iteration, "config-1", "update-config-button.n_clicks"))
+            self.__request("update", update_charts(iteration))
+
+    def __request(self, action: str, body: Dict):
+        request = urllib.request.Request(f"{self.url}/_dash-update-component", data=json.dumps(body).encode(),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response: response.read()
+            failed = False
+        except OSError:
+            failed = True
+        latency = time.perf_counter() - start
+        with self.__lock:
+            self.latencies.setdefault(action, []).append(latency)
+            self.errors += failed
+
+    def report(self) -> pd.DataFrame:
+        """Przepustowość i percentyle czasów odpowiedzi [ms] dla każdej akcji i łącznie"""
+        rows = []
+        for (action, latencies) in [*sorted(self.latencies.items()),
+                                    ("total", [x for values in self.latencies.values() for x in values])]:
+            p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+            rows.append({"action": action, "requests": len(latencies), "throughput": len(latencies) / self.elapsed,
+                         "p50": p50, "p95": p95, "p99": p99})
+        return pd.DataFrame(rows).round(2)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Test obciążeniowy serwera App")
+    parser.add_argument("--url", help="Adres działającego serwera, domyślnie App uruchamiany w tym procesie "
+                                      "(wtedy raportowana jest też pamięć procesu)")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url is None:
+        # Bez logu każdego zapytania, który zasłaniałby raport
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        server = make_server("127.0.0.1", 0, App().app.server, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        args.url = f"http://127.0.0.1:{server.server_port}"
+
+    memory_before = rss() if server else None
+    test = LoadTest(args.url, args.sessions, args.iterations, args.seed).run()
+    memory_after = rss() if server else None
+    if server: server.shutdown()
+
+    pd.set_option('display.width', None)
+    print(test.report().to_string(index=False))
+    print(f"Czas: {test.elapsed:.2f} s, błędy: {test.errors}")
+    if memory_before is not None and memory_after is not None:
+        # Serwer i generator obciążenia działają w jednym procesie, więc pomiar obejmuje oba
+        print(f"Pamięć procesu (serwer + generator obciążenia): "
+              f"{memory_before / 2 ** 20:.1f} MiB -> {memory_after / 2 ** 20:.1f} MiB "
+              f"(+{(memory_after - memory_before) / 2 ** 20:.1f} MiB)")
+    return 1 if test.errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,193 @@
+from imports import *
+
+
+class PlantSystem(object):
+    def __init__(self,
+                 units: int,
+                 g: Union[float, Sequence[float]],
+                 L: Union[float, Sequence[float]],
+
+                 A: Union[float, Sequence[float]],
+                 K: Union[float, Sequence[float]],
+
+                 ro: Union[float, Sequence[float]],
+
+                 t: float,
+                 Tp: float,
+                 save_tolerance: float,
+
+                 kp: Union[float, Sequence[float]],
+                 Ti: Union[float, Sequence[float]],
+                 Td: Union[float, Sequence[float]],
+                 beta: Union[float, Sequence[float]],
+                 eta_T: Union[float, Sequence[float]],
+                 P_dest: Union[float, Sequence[float]],
+                 u_min: Union[float, Sequence[float]],
+                 u_max: Union[float, Sequence[float]],
+                 dtype: str = "float64",
+                 shared_supply: bool = True, **kwargs):
+        """Klasa przetrzymująca elektrownię z wieloma turbinami na wspólnym dopływie
+        Każda turbina ma własny regulator PID, "beta" i "eta_T", a turbiny oddziałują
+        przez wspólne ciśnienie H_H oraz stratę ciśnienia AKL * Q^2 liczoną od sumarycznego przepływu.
+        Stan wszystkich turbin liczony jest wektorowo (jedna tablica na wielkość),
+        dla units=1 wyniki są zgodne z processII.ControlSystem,
+        wygenerowane dane zwrotne są w "dataframe" (po jednym wierszu na turbinę i chwilę)
+        oraz w "plant" (sumy dla całej elektrowni)
+
+        :param units: Liczba turbin
+        :param t: Czas symulacji
+        :param Tp: Czas próbkowania dla P
+        :param save_tolerance: Tolerancja zapisu odczytu [-]
+
+        Parametry turbin - stała dla wszystkich lub sekwencja długości "units":
+        :param g: Stała grawitacji
+        :param L: Odległość
+        :param A: Oporność materiału wykonania rury
+        :param K: Korekta współczynnika A
+        :param ro: Gęstość Substancji
+        :param kp: wzmocnienie regulatora
+        :param Ti: Czas próbkowania dla I
+        :param Td: Czas próbkowania dla D
+        :param beta: współczynnik sterowania szerokością rury
+        :param eta_T: Sprawność turbiny
+        :param P_dest: Cel Energii
+        :param u_min: Minimalna wielkość sterująca
+        :param u_max: Maksymalna wielkość sterująca
+        :param dtype: Typ danych tablic wyników
+        :param shared_supply: False - strata ciśnienia liczona od przepływu własnej turbiny,
+            turbiny są wtedy niezależnymi kopiami processII.ControlSystem (np. do analizy wrażliwości)
+        """
+        self.units = units
+        self.shared_supply = shared_supply
+
+        self.g = self.__per_unit(g)
+        self.L = self.__per_unit(L)
+        self.ro = self.__per_unit(ro)
+
+        self.H_H = self.g * self.L * self.ro
+
+        self.A = self.__per_unit(A)
+        self.K = self.__per_unit(K)
+
+        # Dummy Variables
+        self.dataframe: pd.DataFrame = pd.DataFrame()
+        self.plant: pd.DataFrame = pd.DataFrame()
+
+        # Data Initialization
+        self.__kp: np.ndarray = self.__per_unit(kp)
+        self.__beta: np.ndarray = self.__per_unit(beta)
+        self.__P_dest: np.ndarray = self.__per_unit(P_dest)
+        self.__u_min: np.ndarray = self.__per_unit(u_min)
+        self.__u_max: np.ndarray = self.__per_unit(u_max)
+
+        self.__Tp: float = Tp
+        self.__save_tolerance: float = save_tolerance
+        self.__steps: int = max(int(t / Tp), 1)
+
+        # Computed Data
+        # Historia (krok, wielkość, turbina) zapisywana jednym przypisaniem na krok, "data" - widoki wielkości
+        columns = ("Mm", "P", "e", "u", "S", "H", "Q", "H_loss", "delta_H")
+        self.__history: np.ndarray = np.zeros((self.__steps, len(columns), units), dtype=dtype)
+        self.__data: Dict[str, np.ndarray] = {name: self.__history[:, i] for (i, name) in enumerate(columns)}
+
+        self.__helpers: Dict[str, Union[float, np.ndarray]] = {
+            "Tp/Ti": Tp / self.__per_unit(Ti), "Td/Tp": self.__per_unit(Td) / self.__per_unit(Ti),
+            "-L/g": -(self.L / self.g), "root(2gL)": np.sqrt(2 * self.g * self.L),
+            "geta_T": self.g * self.__per_unit(eta_T),
+            "AKL": self.A * self.K * self.L,
+        }
+
+        # Calculate Data
+        self.__init_control_flow()
+        self.__finalize_data()
+
+    def __per_unit(self, value: Union[float, Sequence[float]]) -> np.ndarray:
+        return np.broadcast_to(np.asarray(value, dtype=float), (self.units,)).copy()
+
+    def __init_control_flow(self):
+        """Pętla kroków na tablicach długości "units"
+        Koszt kroku to głównie narzut kilkudziesięciu wywołań ufunc na małych tablicach, dlatego
+        wszystkie tablice są przygotowane przed pętlą, wyniki trafiają do zaalokowanych z góry buforów,
+        a bufor wyjściowy nigdy nie jest zarazem argumentem (numpy sprawdza wtedy nakładanie się pamięci,
+        co kosztuje więcej niż samo działanie)
+        """
+        helpers = self.__helpers
+        # Stan bieżącego kroku, wiersze w kolejności wielkości historii
+        history, state = self.__history, np.zeros((len(self.__data), self.units))
+        Mm, P, e, u, S, H, Q, H_loss, delta_H = state
+        P_dest, kp, beta, u_min, u_max = self.__P_dest, self.__kp, self.__beta, self.__u_min, self.__u_max
+        TpTi, TdTp, Lg, root = helpers["Tp/Ti"], helpers["Td/Tp"], helpers["-L/g"], helpers["root(2gL)"]
+        geta_T, AKL, H_H, shared_supply = helpers["geta_T"], helpers["AKL"], self.H_H, self.shared_supply
+
+        # Bufory pośrednie, stałe jako tablice (działania z tablicami tego samego typu mają najmniejszy narzut)
+        a, b, c, de, Q_previous, zero, sum_e, sum_next = (np.zeros(self.units) for _ in range(8))
+        closed = np.zeros(self.units, dtype=bool)
+        flow, flow_2 = np.zeros(1 if shared_supply else self.units), np.zeros(1 if shared_supply else self.units)
+        motor, output = np.full(self.units, 0.35), np.full(self.units, 0.65)
+        multiply, add, subtract, divide = np.multiply, np.add, np.subtract, np.divide
+        minimum, maximum, equal, add_reduce = np.minimum, np.maximum, np.equal, np.add.reduce
+
+        for k in range(1, self.__steps):
+            subtract(P_dest, P, a)
+            subtract(a, e, de)
+            e[:] = a
+            add(sum_e, e, sum_next)
+            sum_e, sum_next = sum_next, sum_e
+
+            multiply(TpTi, sum_e, a)
+            add(e, a, b)
+            multiply(TdTp, de, a)
+            add(b, a, c)
+            multiply(kp, c, a)
+            minimum(u_max, a, out=b)
+            maximum(u_min, b, out=u)
+
+            # Bezwładność wody w rurze każdej turbiny, 0 dla zamkniętych turbin (S = 0):
+            # tam dzielnik zamieniany jest na 1, a różnica przepływów na 0
+            equal(S, zero, closed)
+            a[:] = S
+            a[closed] = 1
+            divide(Lg, a, b)
+            subtract(Q, Q_previous, de)
+            de[closed] = 0
+            multiply(b, de, delta_H)
+
+            # Wspólne ciśnienie i strata od sumarycznego przepływu (własnego przy shared_supply=False)
+            add(H_H, delta_H, a)
+            subtract(a, H_loss, H)
+            multiply(u, beta, S)
+            if shared_supply: add_reduce(Q, out=flow, keepdims=True)
+            else: flow[:] = Q
+            multiply(flow, flow, flow_2)
+            multiply(AKL, flow_2, H_loss)
+            Q_previous[:] = Q
+            multiply(S, root, Q)
+
+            multiply(geta_T, Q, a)
+            multiply(a, H, b)
+            add(Mm, b, c)
+            multiply(c, motor, Mm)
+            add(Mm, b, c)
+            multiply(c, output, P)
+            history[k] = state
+
+    # Convert into DataFrame
+    def __finalize_data(self):
+        decimals = round(np.log10(int(1 / self.__save_tolerance)))
+        t = np.arange(self.__steps) * self.__Tp
+
+        self.plant = pd.DataFrame.from_dict({
+            "t": t,
+            "P": self.__data["P"].sum(axis=1),
+            "Q": self.__data["Q"].sum(axis=1),
+            "H_loss": self.__data["H_loss"].mean(axis=1),
+        }).round(decimals)
+
+        # Zaokrąglenie w miejscu i ramka bez kopii - przy wielu turbinach ramka ma steps * units wierszy
+        np.round(self.__history, decimals, out=self.__history)
+        columns = self.__history.transpose(1, 0, 2).reshape(len(self.__data), -1)
+        self.dataframe = pd.DataFrame({
+            "t": np.repeat(t, self.units).round(decimals),
+            "unit": np.tile(np.arange(self.units), self.__steps),
+            **{name: values for (name, values) in zip(self.__data, columns)},
+        }, copy=False)
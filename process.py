@@ -1,4 +1,5 @@
 from imports import *
+from signals import as_profile
 
 
 class ControlSystem(object):
@@ -7,7 +8,7 @@ class ControlSystem(object):
                  A: float,
                  beta: float,
                  h_init: float,
-                 h_dest: float,
+                 h_dest: Union[float, np.ndarray],
                  t: float,
                  Tp: float,
                  Ti: float,
@@ -19,7 +20,8 @@ class ControlSystem(object):
                  Qd_min: float,
                  Qd_max: float,
                  iteration_limit: int,
-                 save_tolerance: float):
+                 save_tolerance: float,
+                 disturbance: Union[float, np.ndarray] = 0):
         """Klasa przetrzymujący układ automatycznej regulacji UAR
         W tym przypadku UAR zbudowany ze zbiornika z dopływem i odpływem wody,
         wygenerowane dane zwrotne są w "dataframe"
@@ -29,7 +31,7 @@ class ControlSystem(object):
         :param A: Pole powierzchi przekroju poprzecznego [m^2]
         :param beta: Współczynnik wypływu [m^{5/2}/s]
         :param h_init: Początkowy poziom substancji [m]
-        :param h_dest: Oczekiwany poziom substancji [m]
+        :param h_dest: Oczekiwany poziom substancji [m], stała lub przebieg na siatce Tp (patrz "signals")
         :param t: Czas trawnia [s]
         :param Tp: Okres Probkowania [1/s]
         :param Ti: Czas Wyprzedzenia [s]
@@ -42,6 +44,7 @@ class ControlSystem(object):
         :param Qd_max: Maksymalne Natężenie dopływu [m^3/s]
         :param iteration_limit: Limit iteracji
         :param save_tolerance: Tolerancja zapisu odczytu
+        :param disturbance: Zakłócenie dopływu [m^3/s], stała lub przebieg na siatce Tp
         """
         # Dummy Variables
         self.dataframe: pd.DataFrame = pd.DataFrame()
@@ -51,7 +54,6 @@ class ControlSystem(object):
         self.__A: float = A
         self.__beta: float = beta
         self.__h_initial: float = h_init
-        self.__h_dest: float = h_dest
         self.__t: float = t
         self.__Tp: float = Tp
         self.__Ti: float = Ti
@@ -79,6 +81,8 @@ class ControlSystem(object):
         self.__save_tolerance: float = save_tolerance
 
         self.__remaining_cycles: int = int(self.__t / self.__Tp)
+        self.__h_dest: np.ndarray = as_profile(h_dest, self.__remaining_cycles)
+        self.__disturbance: np.ndarray = as_profile(disturbance, self.__remaining_cycles)
 
         # Calculate Data
         self.__init_control_flow()
@@ -101,7 +105,7 @@ class ControlSystem(object):
         self.__data["h"].append(self.__quantitize_substance())
 
     def __find_control_difference(self) -> float:
-        return self.__h_dest - self.__data["h"][-1]
+        return self.__h_dest.item(self.__iteration) - self.__data["h"][-1]
 
     def __find_steer(self) -> float:
         return max(self.__u_min, min(self.__u_max,
@@ -118,7 +122,8 @@ class ControlSystem(object):
         return self.__beta * np.sqrt(self.__data["h"][-1])
 
     def __quantitize_substance(self) -> float:
-        return self.__helpers["Tp/A"] * (self.__data["Qd"][-1] - self.__data["Qo"][-1]) + self.__data["h"][-1]
+        return self.__helpers["Tp/A"] * (self.__data["Qd"][-1] - self.__data["Qo"][-1]
+                                         + self.__disturbance.item(self.__iteration)) + self.__data["h"][-1]
 
     def __should_terminate(self) -> bool:
         self.__remaining_cycles -= 1
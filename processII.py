@@ -1,4 +1,6 @@
 from imports import *
+from history import make_history, memory_report
+from signals import as_profile
 
 class ControlSystem(object):
     def __init__(self,
@@ -12,7 +14,7 @@ class ControlSystem(object):
                  ro: float,
 
                  P_init: float,
-                 P_dest: float,
+                 P_dest: Union[float, np.ndarray],
                  beta: float,
 
                  u_min: float,
@@ -23,7 +25,12 @@ class ControlSystem(object):
                  kp: float,
                  Ti: float,
                  Td: float,
-                 save_tolerance: float, **kwargs):
+                 save_tolerance: float,
+                 dtype: str = "float64",
+                 history_limit: Optional[int] = None,
+                 decimation: int = 10,
+                 run: bool = True,
+                 disturbance: Union[float, np.ndarray] = 0, **kwargs):
         """Klasa przetrzymujący układ automatycznej regulacji UAR
         W tym przypadku UAR zbudowany ze Tego i tamtego, przy założeniach, że
         Odległość między cząsteczkami wody jest stała
@@ -38,7 +45,7 @@ class ControlSystem(object):
         :param ro: Gęstość Substancji
 
         :param P_init: Początkowa Moc
-        :param P_dest: Cel Energii
+        :param P_dest: Cel Energii, stała lub przebieg na siatce Tp (patrz "signals")
         :param kp: wzmocnienie regulatora
         :param beta: śmieszna stała sterująca haha
 
@@ -63,6 +70,14 @@ class ControlSystem(object):
 
         :param J * (d*omega)/dt: Ruch podstawy HU
         :param save_tolerance: Tolerancja zapisu odczytu [-]
+
+        :param dtype: Typ danych zapisanej historii, "float32" zmniejsza zużycie pamięci o połowę
+            (obliczenia kroków zawsze w float64, zaokrąglany jest tylko zapis)
+        :param history_limit: Liczba ostatnich kroków trzymanych w całości, starsze są przerzedzane,
+            None - cała historia (raport pamięci w "memory_usage")
+        :param decimation: Początkowy krok przerzedzania starszej historii
+        :param run: Czy przeliczyć całą symulację od razu, False - kroki wykonywane przez "advance"
+        :param disturbance: Zakłócenie mocy na wyjściu [W], stała lub przebieg na siatce Tp
         """
         self.beta = beta
 
@@ -81,6 +96,8 @@ class ControlSystem(object):
 
         # Dummy Variables
         self.dataframe: pd.DataFrame = pd.DataFrame()
+        self.memory_usage: Dict[str, int] = dict()
+        self.finished: bool = False
 
         # Data Initialization
         self.__kp: float = kp
@@ -94,9 +111,14 @@ class ControlSystem(object):
         self.__u_max: float = u_max
 
         # Computed Data
-        self.__data: Dict[str, List[float]] = {
-            "Mm": [0], "t": [0], "P": [0], "e": [0], "u": [0], "S": [0], "H": [0], "Q": [0], "H_loss": [0], "delta_H": [0],
+        # Ostatnie wartości jako zwykłe liczby float (kolejność kolumn historii),
+        # "previous" - wartości e i Q z kroku wcześniej, potrzebne rekurencji regulatora
+        self.__state: Dict[str, float] = {
+            "Mm": 0., "t": 0., "P": 0., "e": 0., "u": 0., "S": 0., "H": 0., "Q": 0., "H_loss": 0., "delta_H": 0.,
         }
+        self.__previous: Dict[str, float] = {"e": 0., "Q": 0.}
+        self.__data = make_history(list(self.__state), int(t / Tp), dtype, history_limit, decimation)
+        self.__data.append(tuple(self.__state.values()))
 
         self.__helpers: Dict[str, float] = {
             "Tp/Ti": self.__Tp / self.__Ti or 0, "Td/Tp": self.__Td / self.__Ti or 0, "sum_e": 0,
@@ -110,7 +132,10 @@ class ControlSystem(object):
         self.__save_tolerance: float = save_tolerance
         self.__remaining_cycles: int = int(self.__helpers['t/Tp'])  # 100000
         self.__iteration_count: int = 0
+        self.__P_dest: np.ndarray = as_profile(P_dest, self.__remaining_cycles)
+        self.__disturbance: np.ndarray = as_profile(disturbance, self.__remaining_cycles)
         # Calculate Data
+        if not run: return
         self.__init_control_flow()
         self.__finalize_data()
 
@@ -118,56 +143,73 @@ class ControlSystem(object):
         while not self.__should_terminate():
             self.__process_step()
 
+    def advance(self, steps: int) -> Dict[str, List[float]]:
+        """Wykonuje kolejne kroki symulacji (do "steps") i zwraca nowo wyliczone próbki,
+        po ostatnim kroku przygotowuje "dataframe" i ustawia "finished"
+        """
+        chunk: Dict[str, List[float]] = {name: [] for name in self.__state}
+        for _ in range(steps):
+            if self.finished: break
+            if self.__should_terminate():
+                self.__finalize_data()
+                break
+            self.__process_step()
+            for (name, value) in self.__state.items(): chunk[name].append(value)
+        return chunk
+
     def __process_step(self):
-        self.__data["t"].append(self.__iteration_count * self.__Tp)
+        state = self.__state
+        state["t"] = self.__iteration_count * self.__Tp
 
-        self.__data["e"].append(self.__find_control_difference())
-        self.__helpers["sum_e"] += self.__data["e"][-1]
+        self.__previous["e"] = state["e"]
+        state["e"] = self.__find_control_difference()
+        self.__helpers["sum_e"] += state["e"]
 
-        self.__data["u"].append(self.__find_steer())
-        self.__data["delta_H"].append(self.__find_pressure_difference())
-        self.__data["H"].append(self.__find_pressure())
-        self.__data["S"].append(self.__find_cross_section())
+        state["u"] = self.__find_steer()
+        state["delta_H"] = self.__find_pressure_difference()
+        state["H"] = self.__find_pressure()
+        state["S"] = self.__find_cross_section()
 
-        self.__data["H_loss"].append(self.__find_pressure_loss())
-        self.__data["Q"].append(self.__find_flow_rate())
-        self.__data["Mm"].append(self.__find_motor_power())
-        self.__data["P"].append(self.__quantitize_power())
+        state["H_loss"] = self.__find_pressure_loss()
+        self.__previous["Q"] = state["Q"]
+        state["Q"] = self.__find_flow_rate()
+        state["Mm"] = self.__find_motor_power()
+        state["P"] = self.__quantitize_power()
+        self.__data.append(tuple(state.values()))
 
     def __find_control_difference(self) -> float:
-        return self.P_dest - self.__data["P"][-1]
+        return self.__P_dest.item(self.__iteration_count) - self.__state["P"]
 
     def __find_steer(self) -> float:
-        h = self.__data["e"][-1]
+        h = self.__state["e"]
         f = self.__helpers["Tp/Ti"] * self.__helpers["sum_e"]
-        g = self.__helpers["Td/Tp"] * (self.__data["e"][-1] - self.__data["e"][-2])
+        g = self.__helpers["Td/Tp"] * (self.__state["e"] - self.__previous["e"])
         e = self.__kp * (h + f + g)
         k = max(self.__u_min, min(self.__u_max, e))
         return k
 
     def __find_cross_section(self):
-        return self.__data["u"][-1] * self.beta
+        return self.__state["u"] * self.beta
 
     def __find_flow_rate(self) -> float:
-        return self.__data["S"][-1] * self.__helpers["root(2gL)"]
+        return self.__state["S"] * self.__helpers["root(2gL)"]
 
     def __find_pressure_loss(self):
-        return self.__helpers["AKL"] * np.square(self.__data["Q"][-1])
+        return self.__helpers["AKL"] * (self.__state["Q"] * self.__state["Q"])
 
     def __find_pressure_difference(self):
-        if self.__data["S"][-1] == 0: return 0
-        return -self.__helpers["L/g"] / self.__data["S"][-1] * (self.__data["Q"][-1] - self.__data["Q"][-2])
+        if self.__state["S"] == 0: return 0.
+        return -self.__helpers["L/g"] / self.__state["S"] * (self.__state["Q"] - self.__previous["Q"])
 
     def __find_pressure(self):
-        return self.H_H + self.__data["delta_H"][-1] - self.__data["H_loss"][-1]
+        return self.H_H + self.__state["delta_H"] - self.__state["H_loss"]
 
     def __find_motor_power(self):
-        return (self.__data["Mm"][-1] + self.__helpers["geta_T"] * self.__data["Q"][-1] * self.__data["H"][-1]) * 0.35
+        return (self.__state["Mm"] + self.__helpers["geta_T"] * self.__state["Q"] * self.__state["H"]) * 0.35
 
     def __quantitize_power(self) -> float:
-        P = (self.__data["Mm"][-1] + self.__helpers["geta_T"] * self.__data["Q"][-1] * self.__data["H"][-1]) * 0.65
-        # return P
-        return P
+        P = (self.__state["Mm"] + self.__helpers["geta_T"] * self.__state["Q"] * self.__state["H"]) * 0.65
+        return P + self.__disturbance.item(self.__iteration_count)
 
     def __should_terminate(self) -> bool:
         self.__remaining_cycles -= 1
@@ -176,7 +218,7 @@ class ControlSystem(object):
 
     # Convert into DataFrame
     def __finalize_data(self):
-        self.dataframe: pd.DataFrame = pd.DataFrame.from_dict(self.__data)
+        self.dataframe: pd.DataFrame = pd.DataFrame.from_dict(self.__data.to_dict())
         self.dataframe = self.dataframe.groupby(
             self.dataframe['t'].mul(1 / self.__save_tolerance).round()).max().reset_index(drop=True)
         # self.dataframe = pd.concat(
@@ -196,3 +238,5 @@ class ControlSystem(object):
         self.dataframe = self.dataframe.sort_values(by=['t'])
         pd.set_option('display.max_columns', None)
         self.dataframe = self.dataframe.round(round(np.log10(int(1 / self.__save_tolerance))))
+        self.memory_usage = memory_report(self.__data, self.dataframe)
+        self.finished = True
@@ -0,0 +1,96 @@
+from imports import *
+from plant import PlantSystem
+
+default_parameters = ("kp", "beta", "L", "K", "A", "eta_T", "g", "ro", "Ti", "Td")
+
+
+def response_metrics(t: np.ndarray, P: np.ndarray, P_dest: np.ndarray, band: float = 0.02) -> (np.ndarray, np.ndarray):
+    """Czas regulacji [s] i przeregulowanie [%] odpowiedzi mocy
+
+    :param t: Chwile próbkowania, kształt (kroki,)
+    :param P: Moc, kształt (kroki, przebiegi)
+    :param P_dest: Cel Energii dla każdego przebiegu, kształt (przebiegi,)
+    :param band: Pasmo tolerancji czasu regulacji względem P_dest [-]
+    """
+    overshoot = np.full(P_dest.shape, np.nan)
+    np.divide(100 * np.maximum(P.max(axis=0) - P_dest, 0), P_dest, out=overshoot, where=P_dest != 0)
+
+    # Czas regulacji - pierwsza chwila, po której P pozostaje w paśmie wokół P_dest
+    outside = np.abs(P - P_dest) > band * np.abs(P_dest)
+    last_outside = len(t) - 1 - np.argmax(outside[::-1], axis=0)
+    settling_time = np.where(~outside.any(axis=0), t[0],
+                             np.where(last_outside + 1 < len(t), t[np.minimum(last_outside + 1, len(t) - 1)], np.nan))
+    return settling_time, overshoot
+
+
+class SensitivityAnalysis(object):
+    def __init__(self,
+                 config: Dict[str, Union[int, float]],
+                 parameters: Sequence[str] = default_parameters,
+                 relative_step: float = 0.05,
+                 band: float = 0.02):
+        """Analiza wrażliwości czasu regulacji i przeregulowania mocy P na parametry processII
+        Wszystkie zaburzone kopie układu (po dwie na parametr, różnice centralne)
+        liczone są razem jako niezależne turbiny jednego PlantSystem,
+        wygenerowana tabela (posortowana od najbardziej wpływowego parametru) jest w "table"
+
+        :param config: Konfiguracja bazowa processII.ControlSystem
+        :param parameters: Badane parametry
+        :param relative_step: Względny krok zaburzenia parametru [-]
+        :param band: Pasmo tolerancji czasu regulacji względem P_dest [-]
+        """
+        self.config = config
+        self.parameters = list(parameters)
+        self.band = band
+
+        # Dummy Variables
+        self.table: pd.DataFrame = pd.DataFrame()
+        self.baseline: Dict[str, float] = dict()
+
+        # Kopia 0 - bazowa, kopie 2i+1 i 2i+2 - parametr i zwiększony i zmniejszony o krok
+        copies = 1 + 2 * len(self.parameters)
+        batch = {name: np.full(copies, config[name], dtype=float) for name in self.parameters}
+        steps = dict()
+        for (i, name) in enumerate(self.parameters):
+            steps[name] = relative_step * abs(config[name]) or relative_step
+            batch[name][2 * i + 1] += steps[name]
+            batch[name][2 * i + 2] -= steps[name]
+
+        system = PlantSystem(units=copies, shared_supply=False, **{**config, **batch})
+        P_dest = np.broadcast_to(np.asarray(batch.get("P_dest", config["P_dest"]), dtype=float), (copies,))
+        P = system.dataframe.pivot(index='t', columns='unit', values='P')
+        settling_time, overshoot = response_metrics(P.index.to_numpy(), P.to_numpy(), P_dest, band)
+
+        self.baseline = {"settling_time": settling_time[0], "overshoot": overshoot[0]}
+        self.__finalize_table(steps, settling_time, overshoot)
+
+    def __finalize_table(self, steps: Dict[str, float], settling_time: np.ndarray, overshoot: np.ndarray):
+        rows = []
+        for (i, name) in enumerate(self.parameters):
+            value, step = self.config[name], steps[name]
+            row = {"parameter": name, "value": value, "step": step}
+            for (metric, results) in (("settling_time", settling_time), ("overshoot", overshoot)):
+                derivative = (results[2 * i + 1] - results[2 * i + 2]) / (2 * step)
+                row[f"d_{metric}"] = derivative
+                row[f"rel_{metric}"] = derivative * value / results[0] if results[0] else np.nan
+            rows.append(row)
+
+        self.table = pd.DataFrame(rows)
+        rank = self.table[["rel_settling_time", "rel_overshoot"]].abs().fillna(0).max(axis=1)
+        self.table = self.table.loc[rank.sort_values(ascending=False).index].reset_index(drop=True)
+
+    def figure(self) -> go.Figure:
+        """Wykres słupkowy względnych wrażliwości (zmiana % metryki na 1% zmiany parametru)"""
+        fig = go.Figure()
+        fig.update_layout(
+            title="Względna wrażliwość odpowiedzi mocy na parametry",
+            xaxis_title="wrażliwość względna [-]",
+            yaxis_title="parametr",
+            legend_title="legenda",
+            barmode="group",
+        )
+        fig.add_trace(go.Bar(x=self.table['rel_settling_time'], y=self.table['parameter'],
+                             orientation='h', name="Czas regulacji"))
+        fig.add_trace(go.Bar(x=self.table['rel_overshoot'], y=self.table['parameter'],
+                             orientation='h', name="Przeregulowanie"))
+        return fig
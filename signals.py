@@ -0,0 +1,74 @@
+import hashlib
+
+from imports import *
+
+
+def time_grid(t: float, Tp: float) -> np.ndarray:
+    """Chwile próbkowania symulacji (indeks = numer kroku)
+
+    :param t: Czas symulacji [s]
+    :param Tp: Okres próbkowania [s]
+    """
+    return np.arange(int(t / Tp) + 1) * Tp
+
+
+def step(t: float, Tp: float, before: float, after: float, at: float) -> np.ndarray:
+    """Skok wartości z "before" na "after" w chwili "at" [s]"""
+    return np.where(time_grid(t, Tp) < at, before, after)
+
+
+def ramp(t: float, Tp: float, start: float, end: float, t_start: float, t_end: float) -> np.ndarray:
+    """Liniowa zmiana wartości od "start" do "end" w przedziale czasu [t_start, t_end]"""
+    return np.interp(time_grid(t, Tp), [t_start, t_end], [start, end])
+
+
+def piecewise(t: float, Tp: float, times: Sequence[float], values: Sequence[float]) -> np.ndarray:
+    """Przebieg schodkowy - wartość values[i] obowiązuje od chwili times[i] do times[i + 1],
+    przed times[0] obowiązuje values[0]
+    """
+    indices = np.searchsorted(np.asarray(times), time_grid(t, Tp), side='right') - 1
+    return np.asarray(values, dtype=float)[np.clip(indices, 0, None)]
+
+
+def recorded(path: str, t: float, Tp: float, time_column: int = 0, value_column: int = 1,
+             delimiter: str = ',', skiprows: int = 1) -> np.ndarray:
+    """Przebieg z zapisu CSV przepróbkowany (interpolacja liniowa) na siatkę "Tp"
+    Przy pierwszym użyciu CSV zostaje zapisany obok jako plik .npy (osobny dla każdego
+    zestawu parametrów parsowania), kolejne odczyty mapują go do pamięci zamiast parsować tekst.
+    Gdy katalogu nie da się zapisać, CSV jest parsowany w pamięci przy każdym wywołaniu
+
+    :param path: Ścieżka do pliku CSV
+    :param time_column: Kolumna z czasem [s]
+    :param value_column: Kolumna z wartościami
+    :param delimiter: Separator kolumn
+    :param skiprows: Liczba pomijanych wierszy nagłówka
+    """
+    arguments = repr((time_column, value_column, delimiter, skiprows)).encode()
+    cache = f"{path}.{hashlib.sha1(arguments).hexdigest()[:12]}.npy"
+    if not os.path.exists(cache) or os.path.getmtime(cache) < os.path.getmtime(path):
+        data = np.loadtxt(path, delimiter=delimiter, skiprows=skiprows, usecols=(time_column, value_column), ndmin=2)
+        # Zapis przez plik tymczasowy, żeby przerwany zapis nie zostawił uszkodzonego cache
+        temporary = f"{cache}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, 'wb') as file: np.save(file, data)
+            os.replace(temporary, cache)
+        except OSError:
+            if os.path.exists(temporary): os.remove(temporary)
+            return np.interp(time_grid(t, Tp), data[:, 0], data[:, 1])
+    data = np.load(cache, mmap_mode='r')
+    return np.interp(time_grid(t, Tp), data[:, 0], data[:, 1])
+
+
+def as_profile(value: Union[float, Sequence[float], np.ndarray], steps: int) -> np.ndarray:
+    """Zamienia stałą lub przygotowany przebieg na tablicę wartości dla kroków 0..steps
+
+    :param value: Stała wartość lub przebieg na siatce "Tp" (np. z "step", "ramp", "recorded")
+    :param steps: Liczba kroków symulacji
+
+    Stała zwracana jest jako widok bez kopii (tylko do odczytu), więc nie zajmuje pamięci O(steps)
+    """
+    if np.ndim(value) == 0: return np.broadcast_to(np.float64(value), (steps + 1,))
+    profile = np.asarray(value, dtype=float)
+    if profile.size < steps + 1:
+        raise ValueError(f"Przebieg ma {profile.size} próbek, a symulacja wymaga {steps + 1}")
+    return profile
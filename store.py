@@ -0,0 +1,106 @@
+from imports import *
+from processII import ControlSystem
+from sensitivity import response_metrics
+
+trace_columns = ("t", "P", "Q", "S", "u")  # kolumny zapisywane dla wykresów
+# Stały układ kolumn "metrics.csv" - parametry processII.ControlSystem i metryki odpowiedzi
+metric_columns = ("id", "g", "eta_T", "L", "A", "K", "ro", "P_init", "P_dest", "beta", "u_min", "u_max",
+                  "t", "Tp", "kp", "Ti", "Td", "save_tolerance", "disturbance",
+                  "settling_time", "overshoot", "P_final")
+
+
+class ScenarioStore(object):
+    def __init__(self, path: str):
+        """Katalog z wynikami scenariuszy symulacji
+        Każdy scenariusz to plik "<id>.npz" z kolumnami wykresów, a jego konfiguracja
+        i metryki (czas regulacji, przeregulowanie, moc końcowa) są dopisywane do "metrics.csv".
+        Przebiegi wczytywane są dopiero przy rysowaniu, w pamięci trzymana jest tylko tabela metryk
+
+        :param path: Katalog magazynu
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+        self.__metrics: pd.DataFrame = pd.DataFrame(columns=["id"])
+        self.__metrics_mtime: float = 0
+        self.__ids: Set[str] = set()
+
+    def __metrics_path(self) -> str:
+        return os.path.join(self.path, "metrics.csv")
+
+    def __trace_path(self, scenario_id: str) -> str:
+        return os.path.join(self.path, f"{scenario_id}.npz")
+
+    @staticmethod
+    def __valid_id(scenario_id) -> bool:
+        return isinstance(scenario_id, str) and re.fullmatch(r"[\w\-.]+", scenario_id) is not None \
+            and scenario_id not in (".", "..")
+
+    def contains(self, scenario_id: str) -> bool:
+        """Czy identyfikator jest poprawny i należy do scenariusza z tabeli metryk"""
+        if not self.__valid_id(scenario_id): return False
+        self.metrics()
+        return scenario_id in self.__ids
+
+    def version(self, scenario_id: str) -> Optional[float]:
+        """Wersja zapisanego przebiegu (czas modyfikacji pliku), None dla nieznanego scenariusza"""
+        if not self.contains(scenario_id): return None
+        try:
+            return os.path.getmtime(self.__trace_path(scenario_id))
+        except OSError:
+            return None
+
+    def add(self, scenario_id: str, config: Dict[str, Union[int, float]], dataframe: pd.DataFrame):
+        """Zapisuje przebieg scenariusza i dopisuje jego wiersz metryk"""
+        if not self.__valid_id(scenario_id):
+            raise ValueError(f"Niepoprawny identyfikator scenariusza: {scenario_id}")
+        np.savez(self.__trace_path(scenario_id), **{column: dataframe[column].to_numpy() for column in trace_columns})
+
+        P_dest = np.array([float(np.mean(config["P_dest"]))])
+        settling_time, overshoot = response_metrics(dataframe['t'].to_numpy(), dataframe[['P']].to_numpy(), P_dest)
+        # Wiersz w kolejności nagłówka pliku, niezależnie od kolejności kluczy konfiguracji,
+        # przebiegi (np. P_dest z "signals") zapisywane są jako średnia wartość
+        exists = os.path.exists(self.__metrics_path())
+        columns = list(pd.read_csv(self.__metrics_path(), nrows=0).columns) if exists else list(metric_columns)
+        row = pd.DataFrame([{
+            "id": scenario_id,
+            **{name: float(np.mean(value)) for (name, value) in config.items() if name in columns},
+            "settling_time": settling_time[0],
+            "overshoot": overshoot[0],
+            "P_final": dataframe['P'].iloc[-1],
+        }], columns=columns)
+        row.to_csv(self.__metrics_path(), mode='a', header=not exists, index=False)
+
+    def load(self, scenario_id: str) -> pd.DataFrame:
+        """Wczytuje przebieg scenariusza, KeyError dla identyfikatora spoza magazynu"""
+        if not self.contains(scenario_id): raise KeyError(f"Nieznany scenariusz: {scenario_id}")
+        with np.load(self.__trace_path(scenario_id)) as data:
+            return pd.DataFrame({column: data[column] for column in data.files})
+
+    def metrics(self) -> pd.DataFrame:
+        """Tabela metryk wszystkich scenariuszy, odświeżana gdy plik się zmienił"""
+        if not os.path.exists(self.__metrics_path()): return self.__metrics
+        mtime = os.path.getmtime(self.__metrics_path())
+        if mtime != self.__metrics_mtime:
+            self.__metrics = pd.read_csv(self.__metrics_path(), dtype={"id": str}).drop_duplicates("id", keep="last")
+            self.__metrics_mtime = mtime
+            self.__ids = set(self.__metrics["id"])
+        return self.__metrics
+
+    def page(self, page: int, size: int, sort_by: Optional[List[Dict[str, str]]] = None) -> (List[Dict], int):
+        """Jedna strona tabeli metryk posortowanej według "sort_by" (format dash_table)
+        oraz liczba wszystkich stron
+        """
+        metrics = self.metrics()
+        if sort_by:
+            metrics = metrics.sort_values([column['column_id'] for column in sort_by],
+                                          ascending=[column['direction'] == 'asc' for column in sort_by])
+        pages = max(1, -(-len(metrics) // size))
+        return metrics.iloc[page * size:(page + 1) * size].to_dict('records'), pages
+
+
+def sweep(store: ScenarioStore, config: Dict[str, Union[int, float]], parameter: str, values: Sequence[float]):
+    """Przelicza konfigurację dla kolejnych wartości parametru i zapisuje wyniki w magazynie"""
+    for value in values:
+        scenario = {**config, parameter: value}
+        store.add(f"{parameter}-{value:g}", scenario, ControlSystem(**scenario).dataframe)
@@ -0,0 +1,62 @@
+import pytest
+
+from imports import *
+from history import RingHistory, TypedHistory, make_history
+from processII import ControlSystem
+
+config = {
+    "t": 10, "Tp": 0.001, "Ti": 0.25, "Td": 0.15,
+    "g": 9.81, "L": 10, "A": 0.1, "K": 2000, "eta_T": 0.8, "ro": 789,
+    "u_min": 0, "u_max": 185, "P_init": 0, "P_dest": 1_000,
+    "kp": 0.00015, "beta": 0.00025, "save_tolerance": 0.000001,
+}
+
+
+@pytest.fixture(scope="module")
+def full() -> pd.DataFrame:
+    return ControlSystem(**config).dataframe
+
+
+def test_history_limit_covering_all_steps_reproduces_full_run(full):
+    limited = ControlSystem(**config, history_limit=int(config["t"] / config["Tp"])).dataframe
+    pd.testing.assert_frame_equal(limited.reset_index(drop=True), full.reset_index(drop=True))
+
+
+@pytest.mark.parametrize("history_limit, decimation", [(500, 10), (1000, 3), (64, 1)])
+def test_retained_samples_match_full_run(full, history_limit, decimation):
+    limited = ControlSystem(**config, history_limit=history_limit, decimation=decimation).dataframe
+    assert len(limited) < len(full)
+    # Ostatnie "history_limit" kroków w całości, starsze próbki to podzbiór pełnego przebiegu
+    pd.testing.assert_frame_equal(limited.tail(history_limit).reset_index(drop=True),
+                                  full.tail(history_limit).reset_index(drop=True))
+    matched = full.set_index('t').loc[limited['t']].reset_index()
+    pd.testing.assert_frame_equal(limited.reset_index(drop=True), matched[limited.columns])
+
+
+def test_ring_history_keeps_decimated_prefix_and_recent_rows():
+    history = RingHistory(["i"], capacity=8, dtype="float64", decimation=2)
+    for i in range(100): history.append((i,))
+    values = history.to_dict()["i"]
+    np.testing.assert_array_equal(values[-8:], np.arange(92, 100))
+    older = values[:-8]
+    assert older[0] == 0 and np.all(np.diff(older) > 0) and older[-1] < 92
+    assert len(history) == 100
+
+
+def test_typed_history_grows_beyond_capacity():
+    history = make_history(["a", "b"], capacity=3)
+    assert isinstance(history, TypedHistory)
+    for i in range(10): history.append((i, -i))
+    data = history.to_dict()
+    np.testing.assert_array_equal(data["a"], np.arange(10))
+    np.testing.assert_array_equal(data["b"], -np.arange(10))
+
+
+def test_float32_only_rounds_stored_values(full):
+    reduced = ControlSystem(**config, dtype="float32").dataframe
+    np.testing.assert_allclose(reduced['P'].to_numpy(), full['P'].to_numpy(), rtol=1e-6)
+
+
+def test_invalid_history_limit():
+    with pytest.raises(ValueError):
+        make_history(["a"], capacity=10, history_limit=1)
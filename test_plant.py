@@ -0,0 +1,37 @@
+import pytest
+
+from imports import *
+from plant import PlantSystem
+from processII import ControlSystem
+
+config = {
+    "t": 10, "Tp": 0.001, "Ti": 0.25, "Td": 0.15,
+    "g": 9.81, "L": 10, "A": 0.1, "K": 2000, "eta_T": 0.8, "ro": 789,
+    "u_min": 0, "u_max": 185, "P_init": 0, "P_dest": 1_000,
+    "kp": 0.00015, "beta": 0.00025, "save_tolerance": 0.000001,
+}
+columns = ["t", "Mm", "P", "e", "u", "S", "H", "Q", "H_loss", "delta_H"]
+
+
+@pytest.mark.parametrize("changes", [{}, {"kp": 0.02, "L": 20}, {"P_dest": 5_000_000, "u_max": 40}])
+def test_single_unit_matches_process_ii(changes):
+    expected = ControlSystem(**{**config, **changes}).dataframe[columns].reset_index(drop=True)
+    result = PlantSystem(units=1, **{**config, **changes}).dataframe[columns].reset_index(drop=True)
+    pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+
+def test_independent_units_match_separate_runs():
+    betas = [0.00025, 0.0001, 0.0004]
+    plant = PlantSystem(units=len(betas), shared_supply=False, **{**config, "beta": betas}).dataframe
+    for (unit, beta) in enumerate(betas):
+        expected = ControlSystem(**{**config, "beta": beta}).dataframe[columns].reset_index(drop=True)
+        result = plant[plant['unit'] == unit][columns].reset_index(drop=True)
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+
+def test_shared_supply_sums_flow_into_loss():
+    plant = PlantSystem(units=2, **config)
+    Q = plant.dataframe.pivot(index='t', columns='unit', values='Q').to_numpy()
+    H_loss = plant.dataframe.pivot(index='t', columns='unit', values='H_loss').to_numpy()
+    np.testing.assert_allclose(H_loss[1:, 0], config["A"] * config["K"] * config["L"] * Q[:-1].sum(axis=1) ** 2,
+                               atol=1e-3)  # Q zapisane z dokładnością 1e-6
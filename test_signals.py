@@ -0,0 +1,33 @@
+from imports import *
+from signals import recorded
+
+
+def write_csv(path, text: str) -> str:
+    path.write_text(text)
+    return str(path)
+
+
+def test_recorded_parse_arguments_do_not_share_cache(tmp_path):
+    path = write_csv(tmp_path / "profile.csv", "t;a;b\n0;0;10\n1;1;20\n2;2;30\n")
+    np.testing.assert_array_equal(recorded(path, 2, 1, delimiter=';'), [0, 1, 2])
+    np.testing.assert_array_equal(recorded(path, 2, 1, value_column=2, delimiter=';'), [10, 20, 30])
+    np.testing.assert_array_equal(recorded(path, 2, 1, delimiter=';', skiprows=2), [1, 1, 2])
+
+
+def test_recorded_reparses_modified_file(tmp_path):
+    path = write_csv(tmp_path / "profile.csv", "t,v\n0,1\n1,1\n")
+    np.testing.assert_array_equal(recorded(path, 1, 1), [1, 1])
+    write_csv(tmp_path / "profile.csv", "t,v\n0,5\n1,5\n")
+    os.utime(path, (time.time() + 10, time.time() + 10))
+    np.testing.assert_array_equal(recorded(path, 1, 1), [5, 5])
+
+
+def test_recorded_falls_back_to_memory_when_cache_cannot_be_written(tmp_path, monkeypatch):
+    path = write_csv(tmp_path / "profile.csv", "t,v\n0,0\n2,4\n")
+
+    def read_only(*args):
+        raise PermissionError("katalog tylko do odczytu")
+
+    monkeypatch.setattr(os, "replace", read_only)
+    np.testing.assert_array_equal(recorded(path, 2, 1), [0, 2, 4])
+    assert os.listdir(tmp_path) == ["profile.csv"]
@@ -0,0 +1,37 @@
+from imports import *
+from signals import step
+from store import ScenarioStore, metric_columns
+from processII import ControlSystem
+
+config = {
+    "t": 10, "Tp": 0.05, "Ti": 0.25, "Td": 0.15,
+    "g": 9.81, "L": 10, "A": 0.1, "K": 2000, "eta_T": 0.8, "ro": 789,
+    "u_min": 0, "u_max": 185, "P_init": 0, "P_dest": 1_000,
+    "kp": 0.00015, "beta": 0.00025, "save_tolerance": 0.000001,
+}
+
+
+def test_metrics_rows_aligned_regardless_of_config_key_order(tmp_path):
+    store = ScenarioStore(str(tmp_path))
+    reordered = {name: config[name] for name in reversed(list(config))}
+    changed = {**reordered, "kp": 0.0002, "L": 20}
+    store.add("first", config, ControlSystem(**config).dataframe)
+    store.add("second", changed, ControlSystem(**changed).dataframe)
+
+    metrics = store.metrics().set_index("id")
+    assert list(metrics.reset_index().columns) == list(metric_columns)
+    for (scenario_id, scenario) in (("first", config), ("second", changed)):
+        for (name, value) in scenario.items():
+            assert metrics.loc[scenario_id, name] == value, (scenario_id, name)
+
+
+def test_profile_parameters_stored_as_mean(tmp_path):
+    store = ScenarioStore(str(tmp_path))
+    P_dest = step(config["t"], config["Tp"], 1_000, 2_000, 5)
+    scenario = {**config, "P_dest": P_dest, "dtype": "float32"}
+    store.add("profile", scenario, ControlSystem(**scenario).dataframe)
+
+    metrics = store.metrics().set_index("id")
+    assert metrics.loc["profile", "P_dest"] == np.mean(P_dest)
+    assert np.isnan(metrics.loc["profile", "disturbance"])
+    np.testing.assert_array_equal(store.load("profile")["t"], ControlSystem(**scenario).dataframe["t"])